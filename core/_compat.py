@@ -0,0 +1,13 @@
+"""Optional-dependency shims shared by the core engines."""
+
+from __future__ import annotations
+
+from typing import Any
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; kernels run as plain Python without it.
+    def njit(*args: Any, **kwargs: Any) -> Any:
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -5,32 +5,103 @@ from __future__ import annotations
 import hashlib
 import json
 import math
-import random
-from datetime import datetime, timezone
+import sys
+import time
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the demo printer falls back to the stdlib encoder.
+    orjson = None
+
+try:
+    from ._compat import njit
+except ImportError:
+    from _compat import njit
+
 
 MODEL_VERSION = "mvp-contract-v1.0.0"
 
+# Option ids used as dict keys and in winner comparisons throughout the engine.
+_OPT_REPAIR = sys.intern("repair_battery")
+_OPT_REFURB = sys.intern("refurb_buy")
+_OPT_TRADEIN = sys.intern("tradein_new")
+
+# Order matches the contribution values returned by _assess_kernel; ties keep this order.
+_KEY_DRIVER_NAMES = (
+    "battery_health_percent",
+    "charge_cycles",
+    "frame_drop_rate",
+    "repair_history_count",
+    "device_age_months",
+)
+
 
 def clamp(value: float, min_value: float, max_value: float) -> float:
     """Clamp a numeric value into [min_value, max_value]."""
     return max(min_value, min(max_value, value))
 
 
+_PRIORITY_WEIGHTS = {"low": 1.0, "medium": 2.0, "high": 3.0}
+
+
 def map_priority(priority: str) -> float:
     """Map textual priority level into numeric weight."""
-    mapping = {"low": 1.0, "medium": 2.0, "high": 3.0}
-    if priority not in mapping:
+    if priority not in _PRIORITY_WEIGHTS:
         raise ValueError(f"Invalid priority: {priority}")
-    return mapping[priority]
+    return _PRIORITY_WEIGHTS[priority]
+
+
+def _normalized_weights(budget: str, sust: str, perf: str) -> tuple[float, float, float]:
+    """Normalize (budget, sustainability, performance) priorities to sum to 1."""
+    cost_w = map_priority(budget)
+    sust_w = map_priority(sust)
+    perf_w = map_priority(perf)
+    total_weight = cost_w + sust_w + perf_w
+    return cost_w / total_weight, sust_w / total_weight, perf_w / total_weight
+
+
+# (budget, sustainability, performance) priority triple -> normalized weights.
+_WEIGHT_TABLE = {
+    (budget, sust, perf): _normalized_weights(budget, sust, perf)
+    for budget in _PRIORITY_WEIGHTS
+    for sust in _PRIORITY_WEIGHTS
+    for perf in _PRIORITY_WEIGHTS
+}
+
+
+def _canonical_bytes(payload: dict[str, Any]) -> bytes:
+    """Serialize the assess input fields into a fixed-order byte buffer.
+
+    The buffer feeds the seed/impact digest. Fields are repr-encoded and
+    NUL-separated so distinct inputs never produce the same buffer.
+    """
+    device = payload["device"]
+    signals = payload["signals"]
+    prefs = payload["user_preferences"]
+    return "\0".join(
+        (
+            repr(device["brand"]),
+            repr(device["model"]),
+            repr(device["age_months"]),
+            repr(signals["battery_health_percent"]),
+            repr(signals["charge_cycles"]),
+            repr(signals["frame_drop_rate"]),
+            repr(signals["repair_history_count"]),
+            repr(prefs["budget_priority"]),
+            repr(prefs["sustainability_priority"]),
+            repr(prefs["performance_priority"]),
+            repr(prefs["prefers_financing"]),
+        )
+    ).encode("utf-8")
+
 
+def _stable_digest(canonical: bytes) -> bytes:
+    """Create a deterministic SHA-256 digest from the canonical input buffer.
 
-def _stable_seed(payload: dict[str, Any]) -> int:
-    """Create a deterministic seed from input payload."""
-    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
-    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
-    return int(digest[:8], 16)
+    Bytes 0-3 seed the request_id; bytes 4-21 drive the estimated impacts.
+    """
+    return hashlib.sha256(canonical).digest()
 
 
 def _validate_input_payload(input_payload: dict[str, Any]) -> None:
@@ -69,33 +140,161 @@ def _validate_input_payload(input_payload: dict[str, Any]) -> None:
         raise ValueError("user_preferences.prefers_financing must be bool")
 
 
-def _compute_rul_and_confidence(input_payload: dict[str, Any]) -> tuple[dict[str, Any], float, float]:
-    """Compute RUL estimate, confidence and base RUL point from heuristics."""
-    device = input_payload["device"]
-    signals = input_payload["signals"]
-
-    age_months = device["age_months"]
-    battery_health_percent = signals["battery_health_percent"]
-    charge_cycles = signals["charge_cycles"]
-    frame_drop_rate = float(signals["frame_drop_rate"])
-    repair_history_count = signals["repair_history_count"]
+@njit(cache=True)
+def _assess_kernel(
+    age_months: float,
+    battery_health_percent: int,
+    charge_cycles: float,
+    frame_drop_rate: float,
+    repair_history_count: float,
+    prefers_financing: bool,
+    w_cost: float,
+    w_sust: float,
+    w_perf: float,
+) -> tuple[float, ...]:
+    """Scalar assess math shared by the RUL estimate and the option scores.
+
+    Returns rul_min, rul_max, confidence_score, the five key-driver
+    contributions (in _KEY_DRIVER_NAMES order) and (cost, sust, perf,
+    overall) for repair_battery, refurb_buy and tradein_new.
+    """
+    # Clamps are inlined as conditional expressions to avoid a call per bound.
+    c_batt = (100 - battery_health_percent) / 60.0
+    c_cycles = charge_cycles / 1200.0
+    c_frame = frame_drop_rate / 0.4
+    c_repairs = repair_history_count / 4.0
+    c_age = age_months / 48.0
 
     rul_point = 24.0
-    rul_point -= clamp(age_months / 6.0, 0.0, 12.0)
+    age_penalty = age_months / 6.0
+    rul_point -= 0.0 if age_penalty < 0.0 else 12.0 if age_penalty > 12.0 else age_penalty
     rul_point -= (100 - battery_health_percent) / 10.0
     rul_point -= charge_cycles / 400.0
     rul_point -= frame_drop_rate * 10.0
     rul_point -= repair_history_count * 1.5
-    rul_point = clamp(rul_point, 1.0, 30.0)
-
-    risk = (
-        age_months / 48.0
-        + ((100 - battery_health_percent) / 60.0)
-        + (charge_cycles / 1200.0)
-        + (frame_drop_rate / 0.4)
-        + (repair_history_count / 4.0)
+    rul_point = 1.0 if rul_point < 1.0 else 30.0 if rul_point > 30.0 else rul_point
+
+    risk = c_age + c_batt + c_cycles + c_frame + c_repairs
+    confidence_score = 1.0 - (risk / 5.0)
+    confidence_score = 0.35 if confidence_score < 0.35 else 0.9 if confidence_score > 0.9 else confidence_score
+
+    margin = 2.0 + (1.0 - confidence_score) * 4.0
+    rul_min = int(max(1, math.floor(rul_point - margin)))
+    rul_max = int(min(30, math.ceil(rul_point + margin)))
+
+    heavy_usage = (c_cycles + c_frame + c_repairs) / 3.0
+    heavy_usage = 0.0 if heavy_usage < 0.0 else 1.2 if heavy_usage > 1.2 else heavy_usage
+    battery_degradation = (100 - battery_health_percent) / 100.0
+    battery_degradation = 0.0 if battery_degradation < 0.0 else 1.0 if battery_degradation > 1.0 else battery_degradation
+
+    repair_cost = 0.90 - max(age_months - 24, 0) * 0.002
+    repair_cost = 0.75 if repair_cost < 0.75 else 0.95 if repair_cost > 0.95 else repair_cost
+    repair_sust = 0.90 - max(repair_history_count - 1, 0) * 0.03
+    repair_sust = 0.75 if repair_sust < 0.75 else 0.95 if repair_sust > 0.95 else repair_sust
+    repair_perf = 0.66 - heavy_usage * 0.10 - battery_degradation * 0.06
+    repair_perf = 0.42 if repair_perf < 0.42 else 0.74 if repair_perf > 0.74 else repair_perf
+
+    refurb_cost = 0.72 - heavy_usage * 0.04
+    refurb_cost = 0.58 if refurb_cost < 0.58 else 0.80 if refurb_cost > 0.80 else refurb_cost
+    refurb_sust = 0.78 - heavy_usage * 0.03
+    refurb_sust = 0.65 if refurb_sust < 0.65 else 0.85 if refurb_sust > 0.85 else refurb_sust
+    refurb_perf = 0.81 + heavy_usage * 0.07
+    refurb_perf = 0.70 if refurb_perf < 0.70 else 0.92 if refurb_perf > 0.92 else refurb_perf
+
+    tradein_cost = 0.48 + (0.10 if prefers_financing else 0.0) - heavy_usage * 0.02
+    tradein_cost = 0.35 if tradein_cost < 0.35 else 0.68 if tradein_cost > 0.68 else tradein_cost
+    tradein_sust = 0.58 - heavy_usage * 0.04
+    tradein_sust = 0.40 if tradein_sust < 0.40 else 0.70 if tradein_sust > 0.70 else tradein_sust
+    tradein_perf = 0.93 + heavy_usage * 0.03
+    tradein_perf = 0.90 if tradein_perf < 0.90 else 0.99 if tradein_perf > 0.99 else tradein_perf
+
+    return (
+        rul_min,
+        rul_max,
+        confidence_score,
+        c_batt,
+        c_cycles,
+        c_frame,
+        c_repairs,
+        c_age,
+        repair_cost,
+        repair_sust,
+        repair_perf,
+        repair_cost * w_cost + repair_sust * w_sust + repair_perf * w_perf,
+        refurb_cost,
+        refurb_sust,
+        refurb_perf,
+        refurb_cost * w_cost + refurb_sust * w_sust + refurb_perf * w_perf,
+        tradein_cost,
+        tradein_sust,
+        tradein_perf,
+        tradein_cost * w_cost + tradein_sust * w_sust + tradein_perf * w_perf,
+    )
+
+
+def _top3(vals: tuple[float, float, float, float, float]) -> tuple[int, int, int]:
+    """Return indices of the three largest values, earliest index first on ties."""
+    i = 0
+    for n in range(1, 5):
+        if vals[n] > vals[i]:
+            i = n
+    j = 1 if i == 0 else 0
+    for n in range(5):
+        if n != i and vals[n] > vals[j]:
+            j = n
+    k = -1
+    for n in range(5):
+        if n != i and n != j and (k < 0 or vals[n] > vals[k]):
+            k = n
+    return i, j, k
+
+
+def _compute_all(
+    input_payload: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, dict[str, float]]]:
+    """Compute the RUL estimate and per-option scores in one kernel pass."""
+    device = input_payload["device"]
+    signals = input_payload["signals"]
+    prefs = input_payload["user_preferences"]
+
+    w_cost, w_sust, w_perf = _WEIGHT_TABLE[
+        (prefs["budget_priority"], prefs["sustainability_priority"], prefs["performance_priority"])
+    ]
+
+    (
+        rul_min,
+        rul_max,
+        confidence_score,
+        c_batt,
+        c_cycles,
+        c_frame,
+        c_repairs,
+        c_age,
+        repair_cost,
+        repair_sust,
+        repair_perf,
+        repair_overall,
+        refurb_cost,
+        refurb_sust,
+        refurb_perf,
+        refurb_overall,
+        tradein_cost,
+        tradein_sust,
+        tradein_perf,
+        tradein_overall,
+    ) = _assess_kernel(
+        # Unbounded int signals go in as floats so a jitted kernel never sees
+        # an int wider than 64 bits; the arithmetic converts them anyway.
+        float(device["age_months"]),
+        signals["battery_health_percent"],
+        float(signals["charge_cycles"]),
+        float(signals["frame_drop_rate"]),
+        float(signals["repair_history_count"]),
+        prefs["prefers_financing"],
+        w_cost,
+        w_sust,
+        w_perf,
     )
-    confidence_score = clamp(1.0 - (risk / 5.0), 0.35, 0.9)
 
     if confidence_score >= 0.8:
         confidence = "high"
@@ -104,21 +303,8 @@ def _compute_rul_and_confidence(input_payload: dict[str, Any]) -> tuple[dict[str
     else:
         confidence = "medium"
 
-    margin = 2.0 + (1.0 - confidence_score) * 4.0
-    rul_min = int(max(1, math.floor(rul_point - margin)))
-    rul_max = int(min(30, math.ceil(rul_point + margin)))
-
-    contributions = {
-        "battery_health_percent": (100 - battery_health_percent) / 60.0,
-        "charge_cycles": charge_cycles / 1200.0,
-        "frame_drop_rate": frame_drop_rate / 0.4,
-        "repair_history_count": repair_history_count / 4.0,
-        "device_age_months": age_months / 48.0,
-    }
-    key_drivers = [
-        name
-        for name, _ in sorted(contributions.items(), key=lambda item: item[1], reverse=True)[:3]
-    ]
+    i, j, k = _top3((c_batt, c_cycles, c_frame, c_repairs, c_age))
+    key_drivers = [_KEY_DRIVER_NAMES[i], _KEY_DRIVER_NAMES[j], _KEY_DRIVER_NAMES[k]]
 
     rul_estimate = {
         "rul_months_min": rul_min,
@@ -128,102 +314,198 @@ def _compute_rul_and_confidence(input_payload: dict[str, Any]) -> tuple[dict[str
         # key_drivers is a feature-name list for direct UI labeling.
         "key_drivers": key_drivers,
     }
-    return rul_estimate, confidence_score, rul_point
 
+    scores = {
+        _OPT_REPAIR: {
+            "cost_score": round(repair_cost, 2),
+            "sustainability_score": round(repair_sust, 2),
+            "performance_score": round(repair_perf, 2),
+            "overall_score": round(repair_overall, 2),
+        },
+        _OPT_REFURB: {
+            "cost_score": round(refurb_cost, 2),
+            "sustainability_score": round(refurb_sust, 2),
+            "performance_score": round(refurb_perf, 2),
+            "overall_score": round(refurb_overall, 2),
+        },
+        _OPT_TRADEIN: {
+            "cost_score": round(tradein_cost, 2),
+            "sustainability_score": round(tradein_sust, 2),
+            "performance_score": round(tradein_perf, 2),
+            "overall_score": round(tradein_overall, 2),
+        },
+    }
+    return rul_estimate, scores
 
-def _build_estimated_impacts(rng: random.Random) -> dict[str, dict[str, Any]]:
-    """Create deterministic-but-varied estimated impacts for each option."""
-    repair_min = rng.randint(8, 12)
-    repair_max = min(16, repair_min + rng.randint(4, 6))
 
-    refurb_min = rng.randint(16, 22)
-    refurb_max = min(30, refurb_min + rng.randint(6, 9))
+# (low, high) bounds for the co2/ewaste impact scores, in digest order:
+# repair, refurb, tradein; co2 before ewaste within each option.
+_IMPACT_SCORE_BOUNDS = (
+    (0.82, 0.93),
+    (0.80, 0.92),
+    (0.69, 0.82),
+    (0.62, 0.78),
+    (0.45, 0.62),
+    (0.35, 0.55),
+)
 
-    tradein_min = rng.randint(28, 35)
-    tradein_max = min(45, tradein_min + rng.randint(8, 12))
+
+def _build_estimated_impacts(entropy: bytes) -> dict[str, dict[str, Any]]:
+    """Create deterministic-but-varied estimated impacts for each option.
+
+    entropy must hold at least 18 bytes: one per integer range, then two
+    per impact score.
+    """
+    repair_min = 8 + entropy[0] % 5
+    repair_max = min(16, repair_min + 4 + entropy[1] % 3)
+
+    refurb_min = 16 + entropy[2] % 7
+    refurb_max = min(30, refurb_min + 6 + entropy[3] % 4)
+
+    tradein_min = 28 + entropy[4] % 8
+    tradein_max = min(45, tradein_min + 8 + entropy[5] % 5)
+
+    repair_co2, repair_ewaste, refurb_co2, refurb_ewaste, tradein_co2, tradein_ewaste = [
+        round(low + (high - low) * (int.from_bytes(entropy[offset : offset + 2], "big") / 0xFFFF), 2)
+        for offset, (low, high) in zip(range(6, 18, 2), _IMPACT_SCORE_BOUNDS)
+    ]
 
     return {
-        "repair_battery": {
+        _OPT_REPAIR: {
             "rul_gain_months_min": repair_min,
             "rul_gain_months_max": repair_max,
-            "co2_impact_score": round(rng.uniform(0.82, 0.93), 2),
-            "ewaste_reduction_score": round(rng.uniform(0.80, 0.92), 2),
+            "co2_impact_score": repair_co2,
+            "ewaste_reduction_score": repair_ewaste,
         },
-        "refurb_buy": {
+        _OPT_REFURB: {
             "rul_gain_months_min": refurb_min,
             "rul_gain_months_max": refurb_max,
-            "co2_impact_score": round(rng.uniform(0.69, 0.82), 2),
-            "ewaste_reduction_score": round(rng.uniform(0.62, 0.78), 2),
+            "co2_impact_score": refurb_co2,
+            "ewaste_reduction_score": refurb_ewaste,
         },
-        "tradein_new": {
+        _OPT_TRADEIN: {
             "rul_gain_months_min": tradein_min,
             "rul_gain_months_max": tradein_max,
-            "co2_impact_score": round(rng.uniform(0.45, 0.62), 2),
-            "ewaste_reduction_score": round(rng.uniform(0.35, 0.55), 2),
+            "co2_impact_score": tradein_co2,
+            "ewaste_reduction_score": tradein_ewaste,
         },
     }
 
 
-def _compute_option_scores(input_payload: dict[str, Any]) -> dict[str, dict[str, float]]:
-    """Compute cost/sustainability/performance and weighted overall scores."""
-    signals = input_payload["signals"]
-    prefs = input_payload["user_preferences"]
-    age_months = input_payload["device"]["age_months"]
-
-    battery = signals["battery_health_percent"]
-    charge = signals["charge_cycles"]
-    frame = float(signals["frame_drop_rate"])
-    repairs = signals["repair_history_count"]
-
-    heavy_usage = clamp((charge / 1200.0 + frame / 0.4 + repairs / 4.0) / 3.0, 0.0, 1.2)
-    battery_degradation = clamp((100 - battery) / 100.0, 0.0, 1.0)
-
-    repair_cost = clamp(0.90 - max(age_months - 24, 0) * 0.002, 0.75, 0.95)
-    repair_sust = clamp(0.90 - max(repairs - 1, 0) * 0.03, 0.75, 0.95)
-    repair_perf = clamp(0.66 - heavy_usage * 0.10 - battery_degradation * 0.06, 0.42, 0.74)
-
-    refurb_cost = clamp(0.72 - heavy_usage * 0.04, 0.58, 0.80)
-    refurb_sust = clamp(0.78 - heavy_usage * 0.03, 0.65, 0.85)
-    refurb_perf = clamp(0.81 + heavy_usage * 0.07, 0.70, 0.92)
-
-    tradein_cost = 0.48 + (0.10 if prefs["prefers_financing"] else 0.0) - heavy_usage * 0.02
-    tradein_cost = clamp(tradein_cost, 0.35, 0.68)
-    tradein_sust = clamp(0.58 - heavy_usage * 0.04, 0.40, 0.70)
-    tradein_perf = clamp(0.93 + heavy_usage * 0.03, 0.90, 0.99)
-
-    weights = {
-        "cost": map_priority(prefs["budget_priority"]),
-        "sust": map_priority(prefs["sustainability_priority"]),
-        "perf": map_priority(prefs["performance_priority"]),
-    }
-    total_weight = weights["cost"] + weights["sust"] + weights["perf"]
-    weights = {k: v / total_weight for k, v in weights.items()}
-
-    def overall(cost: float, sust: float, perf: float) -> float:
-        return round(
-            cost * weights["cost"] + sust * weights["sust"] + perf * weights["perf"],
-            2,
-        )
-
+# Static parts of the recommendation cards. scores and estimated_impacts are
+# filled per call and ui is picked from the prebuilt badge variants; nested
+# lists and dicts are copied into each card so responses never share them.
+_REPAIR_CARD_TEMPLATE: dict[str, Any] = {
+    "option_id": _OPT_REPAIR,
+    "title": "Batarya Değişimi",
+    "tagline": "Düşük maliyetle hızlı iyileştirme",
+    "category": "repair",
+    "why_this": [
+        "Başlangıç maliyeti en düşük seçenektir.",
+        "Cihazı elde tutarak e-atık etkisini azaltır.",
+        "Servis süresi kısa olduğu için geçiş maliyeti düşüktür.",
+    ],
+    "scores": None,
+    "estimated_impacts": None,
+    "assumptions": [
+        "Yetkili serviste parça stoğu mevcuttur.",
+        "Ekran ve anakart tarafında ek arıza yoktur.",
+        "Kullanım profili benzer seviyede kalacaktır.",
+    ],
+    "next_steps": [
+        "Servis randevusu oluştur.",
+        "Veri yedeğini al.",
+        "Parça ve işçilik teklifini onayla.",
+        "Değişim sonrası sağlık raporunu doğrula.",
+    ],
+    "ui": None,
+    "triggers": {"open_incentive_flow": False},
+}
+_REPAIR_UI_LOWEST_CO2: dict[str, Any] = {
+    "cta_label": "Servis planla",
+    "badge": "Lowest CO₂",
+    "icon": "battery-charging",
+}
+_REPAIR_UI_LOWEST_COST: dict[str, Any] = {**_REPAIR_UI_LOWEST_CO2, "badge": "Lowest cost"}
+
+_REFURB_CARD_TEMPLATE: dict[str, Any] = {
+    "option_id": _OPT_REFURB,
+    "title": "Refurbished Cihaz Al",
+    "tagline": "Dengeli maliyet ve performans",
+    "category": "refurb",
+    "why_this": [
+        "Yeni cihaza göre daha düşük toplam maliyetle güncel performans sunar.",
+        "Yenilenmiş ürün tercihi çevresel etkiyi dengeler.",
+        "Orta-uzun vadede stabil kullanım ömrü sağlar.",
+    ],
+    "scores": None,
+    "estimated_impacts": None,
+    "assumptions": [
+        "A kalite yenilenmiş stok mevcuttur.",
+        "Minimum 12 ay garanti sağlanır.",
+    ],
+    "next_steps": [
+        "Uygun model ve kapasiteyi seç.",
+        "Garanti ve iade koşullarını doğrula.",
+        "Eski cihazdan veri transfer planını oluştur.",
+    ],
+    "ui": None,
+    "triggers": {"open_incentive_flow": False},
+}
+_REFURB_UI_TOP_CHOICE: dict[str, Any] = {
+    "cta_label": "Refurb seçenekleri",
+    "badge": "Top choice",
+    "icon": "refresh-ccw",
+}
+_REFURB_UI_BALANCED: dict[str, Any] = {**_REFURB_UI_TOP_CHOICE, "badge": "Balanced"}
+
+_TRADEIN_CARD_TEMPLATE: dict[str, Any] = {
+    "option_id": _OPT_TRADEIN,
+    "title": "Eskiyi Ver, Yeniye Geç",
+    "tagline": "En yüksek performans ve en uzun ömür",
+    "category": "trade_in",
+    "why_this": [
+        "Donanım sıçramasıyla en yüksek performans seviyesini sağlar.",
+        "Yoğun kullanımda en uzun RUL kazanımını üretir.",
+        "Trade-in ve finansman seçenekleri başlangıç maliyetini dengeleyebilir.",
+    ],
+    "scores": None,
+    "estimated_impacts": None,
+    "assumptions": [
+        "Trade-in kampanyası aktiftir.",
+        "Seçilen model stokta mevcuttur.",
+        "Finansman uygunluğu kontrolü başarılıdır.",
+    ],
+    "next_steps": [
+        "Trade-in değerini hesapla.",
+        "Teşvik ve finansman seçeneklerini karşılaştır.",
+        "Sipariş ve teslimat planını onayla.",
+    ],
+    "ui": {
+        "cta_label": "Teşvikleri gör",
+        "badge": "Max performance",
+        "icon": "rocket",
+    },
+    "triggers": {"open_incentive_flow": True},
+}
+
+
+def _card_from_template(
+    template: dict[str, Any],
+    scores: dict[str, float],
+    impacts: dict[str, Any],
+    ui: dict[str, Any],
+) -> dict[str, Any]:
+    """Instantiate one recommendation card with its own nested containers."""
     return {
-        "repair_battery": {
-            "cost_score": round(repair_cost, 2),
-            "sustainability_score": round(repair_sust, 2),
-            "performance_score": round(repair_perf, 2),
-            "overall_score": overall(repair_cost, repair_sust, repair_perf),
-        },
-        "refurb_buy": {
-            "cost_score": round(refurb_cost, 2),
-            "sustainability_score": round(refurb_sust, 2),
-            "performance_score": round(refurb_perf, 2),
-            "overall_score": overall(refurb_cost, refurb_sust, refurb_perf),
-        },
-        "tradein_new": {
-            "cost_score": round(tradein_cost, 2),
-            "sustainability_score": round(tradein_sust, 2),
-            "performance_score": round(tradein_perf, 2),
-            "overall_score": overall(tradein_cost, tradein_sust, tradein_perf),
-        },
+        **template,
+        "why_this": list(template["why_this"]),
+        "scores": scores,
+        "estimated_impacts": impacts,
+        "assumptions": list(template["assumptions"]),
+        "next_steps": list(template["next_steps"]),
+        "ui": ui,
+        "triggers": template["triggers"].copy(),
     }
 
 
@@ -236,156 +518,126 @@ def _build_recommendations(
     """Build RecommendationCardV1-compatible recommendation cards."""
     prefs = input_payload["user_preferences"]
 
-    repair_badge = "Lowest CO₂" if prefs["sustainability_priority"] == "high" else "Lowest cost"
-    refurb_badge = "Top choice" if recommended_option_id == "refurb_buy" else "Balanced"
+    # Copy the prebuilt variant so responses never share a ui dict.
+    if prefs["sustainability_priority"] == "high":
+        repair_ui = _REPAIR_UI_LOWEST_CO2.copy()
+    else:
+        repair_ui = _REPAIR_UI_LOWEST_COST.copy()
+    if recommended_option_id == _OPT_REFURB:
+        refurb_ui = _REFURB_UI_TOP_CHOICE.copy()
+    else:
+        refurb_ui = _REFURB_UI_BALANCED.copy()
 
     recommendations = [
-        {
-            "option_id": "repair_battery",
-            "title": "Batarya Değişimi",
-            "tagline": "Düşük maliyetle hızlı iyileştirme",
-            "category": "repair",
-            "why_this": [
-                "Başlangıç maliyeti en düşük seçenektir.",
-                "Cihazı elde tutarak e-atık etkisini azaltır.",
-                "Servis süresi kısa olduğu için geçiş maliyeti düşüktür.",
-            ],
-            "scores": scores["repair_battery"],
-            "estimated_impacts": impacts["repair_battery"],
-            "assumptions": [
-                "Yetkili serviste parça stoğu mevcuttur.",
-                "Ekran ve anakart tarafında ek arıza yoktur.",
-                "Kullanım profili benzer seviyede kalacaktır.",
-            ],
-            "next_steps": [
-                "Servis randevusu oluştur.",
-                "Veri yedeğini al.",
-                "Parça ve işçilik teklifini onayla.",
-                "Değişim sonrası sağlık raporunu doğrula.",
-            ],
-            "ui": {
-                "cta_label": "Servis planla",
-                "badge": repair_badge,
-                "icon": "battery-charging",
-            },
-            "triggers": {"open_incentive_flow": False},
-        },
-        {
-            "option_id": "refurb_buy",
-            "title": "Refurbished Cihaz Al",
-            "tagline": "Dengeli maliyet ve performans",
-            "category": "refurb",
-            "why_this": [
-                "Yeni cihaza göre daha düşük toplam maliyetle güncel performans sunar.",
-                "Yenilenmiş ürün tercihi çevresel etkiyi dengeler.",
-                "Orta-uzun vadede stabil kullanım ömrü sağlar.",
-            ],
-            "scores": scores["refurb_buy"],
-            "estimated_impacts": impacts["refurb_buy"],
-            "assumptions": [
-                "A kalite yenilenmiş stok mevcuttur.",
-                "Minimum 12 ay garanti sağlanır.",
-            ],
-            "next_steps": [
-                "Uygun model ve kapasiteyi seç.",
-                "Garanti ve iade koşullarını doğrula.",
-                "Eski cihazdan veri transfer planını oluştur.",
-            ],
-            "ui": {
-                "cta_label": "Refurb seçenekleri",
-                "badge": refurb_badge,
-                "icon": "refresh-ccw",
-            },
-            "triggers": {"open_incentive_flow": False},
-        },
-        {
-            "option_id": "tradein_new",
-            "title": "Eskiyi Ver, Yeniye Geç",
-            "tagline": "En yüksek performans ve en uzun ömür",
-            "category": "trade_in",
-            "why_this": [
-                "Donanım sıçramasıyla en yüksek performans seviyesini sağlar.",
-                "Yoğun kullanımda en uzun RUL kazanımını üretir.",
-                "Trade-in ve finansman seçenekleri başlangıç maliyetini dengeleyebilir.",
-            ],
-            "scores": scores["tradein_new"],
-            "estimated_impacts": impacts["tradein_new"],
-            "assumptions": [
-                "Trade-in kampanyası aktiftir.",
-                "Seçilen model stokta mevcuttur.",
-                "Finansman uygunluğu kontrolü başarılıdır.",
-            ],
-            "next_steps": [
-                "Trade-in değerini hesapla.",
-                "Teşvik ve finansman seçeneklerini karşılaştır.",
-                "Sipariş ve teslimat planını onayla.",
-            ],
-            "ui": {
-                "cta_label": "Teşvikleri gör",
-                "badge": "Max performance",
-                "icon": "rocket",
-            },
-            "triggers": {"open_incentive_flow": True},
-        },
+        _card_from_template(_REPAIR_CARD_TEMPLATE, scores[_OPT_REPAIR], impacts[_OPT_REPAIR], repair_ui),
+        _card_from_template(_REFURB_CARD_TEMPLATE, scores[_OPT_REFURB], impacts[_OPT_REFURB], refurb_ui),
+        _card_from_template(
+            _TRADEIN_CARD_TEMPLATE,
+            scores[_OPT_TRADEIN],
+            impacts[_OPT_TRADEIN],
+            _TRADEIN_CARD_TEMPLATE["ui"].copy(),
+        ),
     ]
 
     return recommendations
 
 
+_RATIONALE_REPAIR_TMPL = (
+    "Bütçe ve sürdürülebilirlik dengesi mevcut cihaz üzerinde onarımı öne çıkarıyor; "
+    "batarya sağlığı %{batt} ve RUL aralığı {rmin}-{rmax} ay olduğu için "
+    "batarya yenileme güçlü bir kısa-orta vade iyileştirme sunuyor."
+)
+_RATIONALE_WIPE_ANXIETY = (
+    " Ayrıca veri silme kaygısı etkisini azaltmak için cihazı elde tutma yaklaşımı "
+    "bu senaryoda daha uygun."
+)
+_RATIONALE_REFURB = (
+    "Maliyet-performans dengesi bu profilde refurb seçeneğini öne çıkarıyor; "
+    "onarıma göre daha güçlü performans artışı sunarken yeni cihaza göre daha kontrollü "
+    "toplam maliyet ve çevresel etki sağlıyor."
+)
+_RATIONALE_TRADEIN = (
+    "Performans önceliği ve kullanım yoğunluğu trade-in seçeneğini öne çıkarıyor; "
+    "yeni nesil cihaza geçiş bu profilde en yüksek performans ve en uzun kullanım "
+    "ömrü kazanımını sağlıyor."
+)
+
+
 def _build_rationale(
     recommended_option_id: str,
     input_payload: dict[str, Any],
     rul_estimate: dict[str, Any],
 ) -> str:
     """Build concise 1-2 sentence rationale based on winner and inputs."""
-    prefs = input_payload["user_preferences"]
-    signals = input_payload["signals"]
-
-    if recommended_option_id == "repair_battery":
-        rationale = (
-            "Bütçe ve sürdürülebilirlik dengesi mevcut cihaz üzerinde onarımı öne çıkarıyor; "
-            f"batarya sağlığı %{signals['battery_health_percent']} ve RUL aralığı "
-            f"{rul_estimate['rul_months_min']}-{rul_estimate['rul_months_max']} ay olduğu için "
-            "batarya yenileme güçlü bir kısa-orta vade iyileştirme sunuyor."
+    if recommended_option_id == _OPT_REPAIR:
+        prefs = input_payload["user_preferences"]
+        rationale = _RATIONALE_REPAIR_TMPL.format_map(
+            {
+                "batt": input_payload["signals"]["battery_health_percent"],
+                "rmin": rul_estimate["rul_months_min"],
+                "rmax": rul_estimate["rul_months_max"],
+            }
         )
         if prefs["sustainability_priority"] == "high" and not prefs["prefers_financing"]:
-            rationale += (
-                " Ayrıca veri silme kaygısı etkisini azaltmak için cihazı elde tutma yaklaşımı "
-                "bu senaryoda daha uygun."
-            )
+            rationale += _RATIONALE_WIPE_ANXIETY
         return rationale
 
-    if recommended_option_id == "refurb_buy":
-        return (
-            "Maliyet-performans dengesi bu profilde refurb seçeneğini öne çıkarıyor; "
-            "onarıma göre daha güçlü performans artışı sunarken yeni cihaza göre daha kontrollü "
-            "toplam maliyet ve çevresel etki sağlıyor."
-        )
+    if recommended_option_id == _OPT_REFURB:
+        return _RATIONALE_REFURB
 
-    return (
-        "Performans önceliği ve kullanım yoğunluğu trade-in seçeneğini öne çıkarıyor; "
-        "yeni nesil cihaza geçiş bu profilde en yüksek performans ve en uzun kullanım "
-        "ömrü kazanımını sağlıyor."
-    )
+    return _RATIONALE_TRADEIN
 
 
-def assess_logic(input_payload: dict[str, Any]) -> dict[str, Any]:
-    """Generate an assess response compatible with assess.v1 contract."""
-    _validate_input_payload(input_payload)
+_PARETO_NOTE = (
+    "repair_battery en düşük maliyet; refurb_buy dengeli maliyet-performans; "
+    "tradein_new en yüksek performans ve en uzun RUL kazanımı sağlar."
+)
+# Copied into each response; responses never share it.
+_DISCLAIMER: dict[str, str] = {
+    "type": "advisory",
+    "text": "Bu çıktı karar destek amaçlıdır; nihai fiyat ve kampanyalar kanal doğrulamasına tabidir.",
+}
+
+_ASSESS_RESPONSE_KEYS = frozenset(
+    (
+        "request_id",
+        "timestamp_utc",
+        "model_version",
+        "inputs_echo",
+        "rul_estimate",
+        "decision_summary",
+        "recommendations",
+        "disclaimer",
+    )
+)
 
-    seed = _stable_seed(input_payload)
-    rng = random.Random(seed + 42)
 
-    rul_estimate, _, _ = _compute_rul_and_confidence(input_payload)
-    scores = _compute_option_scores(input_payload)
-    impacts = _build_estimated_impacts(rng)
+def _utc_timestamp() -> str:
+    """Current UTC time as a second-resolution ISO-8601 string."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
-    option_order = ["refurb_buy", "repair_battery", "tradein_new"]
-    order_index = {option_id: idx for idx, option_id in enumerate(option_order)}
-    recommended_option_id = max(
-        scores.items(),
-        key=lambda item: (item[1]["overall_score"], -order_index[item[0]]),
-    )[0]
+
+def _assess_at(input_payload: dict[str, Any], timestamp_utc: str) -> dict[str, Any]:
+    """Build one assess response stamped with the given timestamp."""
+    _validate_input_payload(input_payload)
+    canonical = _canonical_bytes(input_payload)
+
+    digest = _stable_digest(canonical)
+    seed = int.from_bytes(digest[:4], "big")
+
+    rul_estimate, scores = _compute_all(input_payload)
+    impacts = _build_estimated_impacts(digest[4:])
+
+    # Highest overall score wins; ties prefer refurb_buy, then repair_battery, then tradein_new.
+    s_refurb = scores[_OPT_REFURB]["overall_score"]
+    s_repair = scores[_OPT_REPAIR]["overall_score"]
+    s_tradein = scores[_OPT_TRADEIN]["overall_score"]
+    if s_refurb >= s_repair and s_refurb >= s_tradein:
+        recommended_option_id = _OPT_REFURB
+    elif s_repair >= s_tradein:
+        recommended_option_id = _OPT_REPAIR
+    else:
+        recommended_option_id = _OPT_TRADEIN
 
     recommendations = _build_recommendations(
         input_payload=input_payload,
@@ -394,16 +646,12 @@ def assess_logic(input_payload: dict[str, Any]) -> dict[str, Any]:
         recommended_option_id=recommended_option_id,
     )
 
-    timestamp_utc = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
     request_id = f"req_{seed:08x}"
 
     decision_summary = {
         "recommended_primary_option_id": recommended_option_id,
         "rationale": _build_rationale(recommended_option_id, input_payload, rul_estimate),
-        "pareto_note": (
-            "repair_battery en düşük maliyet; refurb_buy dengeli maliyet-performans; "
-            "tradein_new en yüksek performans ve en uzun RUL kazanımı sağlar."
-        ),
+        "pareto_note": _PARETO_NOTE,
     }
 
     response = {
@@ -418,27 +666,26 @@ def assess_logic(input_payload: dict[str, Any]) -> dict[str, Any]:
         "rul_estimate": rul_estimate,
         "decision_summary": decision_summary,
         "recommendations": recommendations,
-        "disclaimer": {
-            "type": "advisory",
-            "text": "Bu çıktı karar destek amaçlıdır; nihai fiyat ve kampanyalar kanal doğrulamasına tabidir.",
-        },
+        "disclaimer": _DISCLAIMER.copy(),
     }
 
-    expected_keys = {
-        "request_id",
-        "timestamp_utc",
-        "model_version",
-        "inputs_echo",
-        "rul_estimate",
-        "decision_summary",
-        "recommendations",
-        "disclaimer",
-    }
-    assert set(response.keys()) == expected_keys, "Top-level assess key set mismatch"
+    # Stripped under python -O; keys views compare against sets without copying.
+    assert response.keys() == _ASSESS_RESPONSE_KEYS, "Top-level assess key set mismatch"
 
     return response
 
 
+def assess_logic(input_payload: dict[str, Any]) -> dict[str, Any]:
+    """Generate an assess response compatible with assess.v1 contract."""
+    return _assess_at(input_payload, _utc_timestamp())
+
+
+def assess_logic_many(payloads: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Generate assess responses for a batch of payloads sharing one timestamp."""
+    timestamp_utc = _utc_timestamp()
+    return [_assess_at(input_payload, timestamp_utc) for input_payload in payloads]
+
+
 def run_assess(input_payload: dict[str, Any]) -> dict[str, Any]:
     """Compatibility wrapper for assess logic."""
     return assess_logic(input_payload)
@@ -477,7 +724,12 @@ if __name__ == "__main__":
         },
     }
 
+    def _pretty(payload: dict[str, Any]) -> str:
+        if orjson is not None:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode("utf-8")
+        return json.dumps(payload, ensure_ascii=False, indent=2)
+
     print("=== Scenario A ===")
-    print(json.dumps(assess_logic(scenario_a_input), ensure_ascii=False, indent=2))
+    print(_pretty(assess_logic(scenario_a_input)))
     print("=== Scenario B ===")
-    print(json.dumps(assess_logic(scenario_b_input), ensure_ascii=False, indent=2))
+    print(_pretty(assess_logic(scenario_b_input)))
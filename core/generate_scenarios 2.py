@@ -2,11 +2,20 @@
 
 from __future__ import annotations
 
-import copy
 import json
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; encode_json falls back to the stdlib encoder.
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:  # fastjsonschema is optional; assert_incentive_schema always runs.
+    fastjsonschema = None
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CONTRACTS_DIR = ROOT / "contracts"
@@ -19,11 +28,24 @@ def load_json(path: Path) -> dict[str, Any]:
         return json.load(f)
 
 
-def write_json(path: Path, payload: dict[str, Any]) -> None:
+# Contract files are parsed once at import. Scenario builders merge over
+# _ASSESS_TEMPLATE without mutating it, so it is shared read-only.
+_ASSESS_TEMPLATE = load_json(CONTRACTS_DIR / "assess.v1.example.json")
+_INCENTIVE_SCHEMA = load_json(CONTRACTS_DIR / "incentive.v1.schema.json")
+
+# incentive.v1 compiled once at import into a generated validator function.
+_INCENTIVE_VALIDATOR = fastjsonschema.compile(_INCENTIVE_SCHEMA) if fastjsonschema is not None else None
+
+
+def encode_json(payload: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2) + b"\n"
+    return (json.dumps(payload, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+def write_bytes(path: Path, data: bytes) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    path.write_bytes(data)
     rel = path.relative_to(ROOT)
     print(f"WROTE: {rel}")
 
@@ -136,235 +158,253 @@ def assert_incentive_schema(
     assert isinstance(disclaimer["text"], str) and disclaimer["text"], "disclaimer.text invalid"
 
 
-def build_scenario_a(base: dict[str, Any]) -> dict[str, Any]:
-    scenario = copy.deepcopy(base)
-    scenario["request_id"] = "req_20260215_A001"
-    scenario["timestamp_utc"] = "2026-02-15T15:20:00Z"
-
-    scenario["inputs_echo"]["device"] = {
-        "brand": "Samsung",
-        "model": "Galaxy S22",
-        "age_months": 31,
-    }
-    scenario["inputs_echo"]["signals"] = {
-        "battery_health_percent": 76,
-        "charge_cycles": 702,
-        "frame_drop_rate": 0.09,
-        "repair_history_count": 1,
-    }
-    scenario["inputs_echo"]["user_preferences"] = {
-        "budget_priority": "medium",
-        "sustainability_priority": "high",
-        "performance_priority": "medium",
-        "prefers_financing": False,
-    }
+def validate_incentive(incentive: dict[str, Any], schema: dict[str, Any], scenario_name: str) -> None:
+    assert_incentive_schema(incentive, schema, scenario_name)
+    if _INCENTIVE_VALIDATOR is None:
+        return
+    try:
+        _INCENTIVE_VALIDATOR(incentive)
+    except fastjsonschema.JsonSchemaException as exc:
+        raise AssertionError(f"{scenario_name} schema violation: {exc.message}") from exc
 
-    scenario["rul_estimate"] = {
-        "rul_months_min": 8,
-        "rul_months_max": 15,
-        "confidence": "medium-high",
-        "confidence_score": 0.71,
-        "key_drivers": [
-            "battery_health_percent",
-            "charge_cycles",
-            "device_age_months",
-        ],
-    }
 
-    scenario["decision_summary"] = {
-        "recommended_primary_option_id": "repair_battery",
-        "rationale": (
-            "Sürdürülebilirlik önceliği yüksek ve finansman tercih edilmediği için "
-            "cihazı elde tutup batarya yenileme en dengeli yol; wipe anxiety etkisini "
-            "azaltmak için cihaz devretme ve veri silme adımı minimize ediliyor."
-        ),
-        "pareto_note": (
-            "repair_battery sürdürülebilirlikte güçlü; refurb_buy dengeli ikinci seçenek; "
-            "tradein_new performans zirvesi ama daha yüksek çevresel maliyet."
-        ),
+def build_scenario_a(base: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **base,
+        "request_id": "req_20260215_A001",
+        "timestamp_utc": "2026-02-15T15:20:00Z",
+        "inputs_echo": {
+            **base["inputs_echo"],
+            "device": {
+                "brand": "Samsung",
+                "model": "Galaxy S22",
+                "age_months": 31,
+            },
+            "signals": {
+                "battery_health_percent": 76,
+                "charge_cycles": 702,
+                "frame_drop_rate": 0.09,
+                "repair_history_count": 1,
+            },
+            "user_preferences": {
+                "budget_priority": "medium",
+                "sustainability_priority": "high",
+                "performance_priority": "medium",
+                "prefers_financing": False,
+            },
+        },
+        "rul_estimate": {
+            "rul_months_min": 8,
+            "rul_months_max": 15,
+            "confidence": "medium-high",
+            "confidence_score": 0.71,
+            "key_drivers": [
+                "battery_health_percent",
+                "charge_cycles",
+                "device_age_months",
+            ],
+        },
+        "decision_summary": {
+            "recommended_primary_option_id": "repair_battery",
+            "rationale": (
+                "Sürdürülebilirlik önceliği yüksek ve finansman tercih edilmediği için "
+                "cihazı elde tutup batarya yenileme en dengeli yol; wipe anxiety etkisini "
+                "azaltmak için cihaz devretme ve veri silme adımı minimize ediliyor."
+            ),
+            "pareto_note": (
+                "repair_battery sürdürülebilirlikte güçlü; refurb_buy dengeli ikinci seçenek; "
+                "tradein_new performans zirvesi ama daha yüksek çevresel maliyet."
+            ),
+        },
     }
 
-    return scenario
-
 
 def build_scenario_b(base: dict[str, Any]) -> dict[str, Any]:
-    scenario = copy.deepcopy(base)
-    scenario["request_id"] = "req_20260215_B001"
-    scenario["timestamp_utc"] = "2026-02-15T16:05:00Z"
-
-    scenario["inputs_echo"]["device"] = {
-        "brand": "Apple",
-        "model": "iPhone 13",
-        "age_months": 36,
-    }
-    scenario["inputs_echo"]["signals"] = {
-        "battery_health_percent": 69,
-        "charge_cycles": 982,
-        "frame_drop_rate": 0.19,
-        "repair_history_count": 2,
-    }
-    scenario["inputs_echo"]["user_preferences"] = {
-        "budget_priority": "high",
-        "sustainability_priority": "medium",
-        "performance_priority": "medium",
-        "prefers_financing": True,
-    }
-
-    scenario["rul_estimate"] = {
-        "rul_months_min": 4,
-        "rul_months_max": 9,
-        "confidence": "medium-high",
-        "confidence_score": 0.79,
-        "key_drivers": [
-            "charge_cycles",
-            "frame_drop_rate",
-            "repair_history_count",
-        ],
-    }
-
-    scenario["decision_summary"] = {
-        "recommended_primary_option_id": "refurb_buy",
-        "rationale": (
-            "Bütçe önceliği yüksek ve finansman açık, ancak heavy usage sinyalleri "
-            "(yüksek charge_cycles, frame_drop_rate ve tekrar eden onarım geçmişi) "
-            "nedeniyle kısa vadeli tamir yerine refurb seçeneği toplam maliyeti daha iyi dengeler."
-        ),
-        "pareto_note": (
-            "repair_battery en düşük ilk maliyet; refurb_buy yüksek kullanım altında daha dengeli "
-            "ömür/maliyet; tradein_new en yüksek performans fakat bütçe baskısı için ikincil."
-        ),
+    return {
+        **base,
+        "request_id": "req_20260215_B001",
+        "timestamp_utc": "2026-02-15T16:05:00Z",
+        "inputs_echo": {
+            **base["inputs_echo"],
+            "device": {
+                "brand": "Apple",
+                "model": "iPhone 13",
+                "age_months": 36,
+            },
+            "signals": {
+                "battery_health_percent": 69,
+                "charge_cycles": 982,
+                "frame_drop_rate": 0.19,
+                "repair_history_count": 2,
+            },
+            "user_preferences": {
+                "budget_priority": "high",
+                "sustainability_priority": "medium",
+                "performance_priority": "medium",
+                "prefers_financing": True,
+            },
+        },
+        "rul_estimate": {
+            "rul_months_min": 4,
+            "rul_months_max": 9,
+            "confidence": "medium-high",
+            "confidence_score": 0.79,
+            "key_drivers": [
+                "charge_cycles",
+                "frame_drop_rate",
+                "repair_history_count",
+            ],
+        },
+        "decision_summary": {
+            "recommended_primary_option_id": "refurb_buy",
+            "rationale": (
+                "Bütçe önceliği yüksek ve finansman açık, ancak heavy usage sinyalleri "
+                "(yüksek charge_cycles, frame_drop_rate ve tekrar eden onarım geçmişi) "
+                "nedeniyle kısa vadeli tamir yerine refurb seçeneği toplam maliyeti daha iyi dengeler."
+            ),
+            "pareto_note": (
+                "repair_battery en düşük ilk maliyet; refurb_buy yüksek kullanım altında daha dengeli "
+                "ömür/maliyet; tradein_new en yüksek performans fakat bütçe baskısı için ikincil."
+            ),
+        },
     }
 
-    return scenario
 
-
-def build_incentive_a(model_version: str) -> dict[str, Any]:
-    return {
-        "request_id": "req_20260215_A001_INC",
-        "model_version": model_version,
-        "selected_option_id": "tradein_new",
-        "packages": [
-            {
-                "package_id": "cash",
-                "title": "Nakit Takas Paketi",
-                "description": "Eski cihaz değeri anlık nakit indirim olarak yansıtılır.",
-                "value": {
-                    "cash_amount_try": 11250,
-                    "carbon_points": None,
-                    "perk": "none",
-                },
-                "ui": {
-                    "badge": "Hızlı nakit",
-                    "cta_label": "Nakit paketi seç",
-                },
+# Fixed demo incentives; only model_version is filled per call. The returned
+# dicts share nested values with these templates and must be treated as read-only.
+_INCENTIVE_A_TEMPLATE: dict[str, Any] = {
+    "request_id": "req_20260215_A001_INC",
+    "model_version": None,
+    "selected_option_id": "tradein_new",
+    "packages": [
+        {
+            "package_id": "cash",
+            "title": "Nakit Takas Paketi",
+            "description": "Eski cihaz değeri anlık nakit indirim olarak yansıtılır.",
+            "value": {
+                "cash_amount_try": 11250,
+                "carbon_points": None,
+                "perk": "none",
             },
-            {
-                "package_id": "carbon_points",
-                "title": "Karbon Puan Avantajı",
-                "description": "Sürdürülebilirlik odaklı senaryoda en yüksek karbon puan getirisi.",
-                "value": {
-                    "cash_amount_try": None,
-                    "carbon_points": 19800,
-                    "perk": "tree",
-                },
-                "ui": {
-                    "badge": "En yüksek karbon etkisi",
-                    "cta_label": "Karbon puanı seç",
-                },
+            "ui": {
+                "badge": "Hızlı nakit",
+                "cta_label": "Nakit paketi seç",
             },
-            {
-                "package_id": "hybrid",
-                "title": "Hibrit Denge Paketi",
-                "description": "Nakit ve karbon puanını dengeli bir şekilde birleştirir.",
-                "value": {
-                    "cash_amount_try": 6800,
-                    "carbon_points": 8200,
-                    "perk": "donation",
-                },
-                "ui": {
-                    "badge": "Dengeli teklif",
-                    "cta_label": "Hibrit paketi seç",
-                },
+        },
+        {
+            "package_id": "carbon_points",
+            "title": "Karbon Puan Avantajı",
+            "description": "Sürdürülebilirlik odaklı senaryoda en yüksek karbon puan getirisi.",
+            "value": {
+                "cash_amount_try": None,
+                "carbon_points": 19800,
+                "perk": "tree",
+            },
+            "ui": {
+                "badge": "En yüksek karbon etkisi",
+                "cta_label": "Karbon puanı seç",
             },
-        ],
-        "accept_score": 0.74,
-        "impact_score": 0.91,
-        "notes": [
-            "Veri silme süreci sertifikalı olarak yürütülür ve teslimde belge sağlanır.",
-            "Karbon puanı paketi bu senaryoda en cazip çevresel etkiyi sunar.",
-        ],
-        "disclaimer": {
-            "type": "advisory",
-            "text": "Teşvik değerleri kanal, stok ve kampanya koşullarına göre işlem anında değişebilir.",
         },
-    }
+        {
+            "package_id": "hybrid",
+            "title": "Hibrit Denge Paketi",
+            "description": "Nakit ve karbon puanını dengeli bir şekilde birleştirir.",
+            "value": {
+                "cash_amount_try": 6800,
+                "carbon_points": 8200,
+                "perk": "donation",
+            },
+            "ui": {
+                "badge": "Dengeli teklif",
+                "cta_label": "Hibrit paketi seç",
+            },
+        },
+    ],
+    "accept_score": 0.74,
+    "impact_score": 0.91,
+    "notes": [
+        "Veri silme süreci sertifikalı olarak yürütülür ve teslimde belge sağlanır.",
+        "Karbon puanı paketi bu senaryoda en cazip çevresel etkiyi sunar.",
+    ],
+    "disclaimer": {
+        "type": "advisory",
+        "text": "Teşvik değerleri kanal, stok ve kampanya koşullarına göre işlem anında değişebilir.",
+    },
+}
 
 
-def build_incentive_b(model_version: str) -> dict[str, Any]:
-    return {
-        "request_id": "req_20260215_B001_INC",
-        "model_version": model_version,
-        "selected_option_id": "tradein_new",
-        "packages": [
-            {
-                "package_id": "cash",
-                "title": "Maksimum Nakit Paketi",
-                "description": "Bütçe ve yüksek kullanım profili için en yüksek nakit teklif.",
-                "value": {
-                    "cash_amount_try": 14900,
-                    "carbon_points": None,
-                    "perk": "extra_data",
-                },
-                "ui": {
-                    "badge": "En yüksek nakit",
-                    "cta_label": "Nakit paketi seç",
-                },
+def build_incentive_a(model_version: str) -> dict[str, Any]:
+    return _INCENTIVE_A_TEMPLATE | {"model_version": model_version}
+
+
+_INCENTIVE_B_TEMPLATE: dict[str, Any] = {
+    "request_id": "req_20260215_B001_INC",
+    "model_version": None,
+    "selected_option_id": "tradein_new",
+    "packages": [
+        {
+            "package_id": "cash",
+            "title": "Maksimum Nakit Paketi",
+            "description": "Bütçe ve yüksek kullanım profili için en yüksek nakit teklif.",
+            "value": {
+                "cash_amount_try": 14900,
+                "carbon_points": None,
+                "perk": "extra_data",
+            },
+            "ui": {
+                "badge": "En yüksek nakit",
+                "cta_label": "Nakit paketi seç",
+            },
+        },
+        {
+            "package_id": "carbon_points",
+            "title": "Karbon Puan Paketi",
+            "description": "Nakit yerine karbon puanı odaklı alternatif teklif.",
+            "value": {
+                "cash_amount_try": None,
+                "carbon_points": 9800,
+                "perk": "tree",
+            },
+            "ui": {
+                "badge": "Çevresel alternatif",
+                "cta_label": "Karbon puanı seç",
             },
-            {
-                "package_id": "carbon_points",
-                "title": "Karbon Puan Paketi",
-                "description": "Nakit yerine karbon puanı odaklı alternatif teklif.",
-                "value": {
-                    "cash_amount_try": None,
-                    "carbon_points": 9800,
-                    "perk": "tree",
-                },
-                "ui": {
-                    "badge": "Çevresel alternatif",
-                    "cta_label": "Karbon puanı seç",
-                },
+        },
+        {
+            "package_id": "hybrid",
+            "title": "Orta Seviye Hibrit Paket",
+            "description": "Nakit ve karbon puanını orta seviyede birleştiren teklif.",
+            "value": {
+                "cash_amount_try": 8100,
+                "carbon_points": 5200,
+                "perk": "none",
             },
-            {
-                "package_id": "hybrid",
-                "title": "Orta Seviye Hibrit Paket",
-                "description": "Nakit ve karbon puanını orta seviyede birleştiren teklif.",
-                "value": {
-                    "cash_amount_try": 8100,
-                    "carbon_points": 5200,
-                    "perk": "none",
-                },
-                "ui": {
-                    "badge": "Orta denge",
-                    "cta_label": "Hibrit paketi seç",
-                },
+            "ui": {
+                "badge": "Orta denge",
+                "cta_label": "Hibrit paketi seç",
             },
-        ],
-        "accept_score": 0.86,
-        "impact_score": 0.67,
-        "notes": [
-            "Yüksek kullanım profilinde nakit paketi toplam maliyet baskısını hızlı azaltır.",
-            "Hibrit paket orta seviyede nakit ve puan dengesini korur.",
-        ],
-        "disclaimer": {
-            "type": "advisory",
-            "text": "Teşvik değerleri işlem anındaki takas skoru ve kampanya kurallarına bağlıdır.",
         },
-    }
+    ],
+    "accept_score": 0.86,
+    "impact_score": 0.67,
+    "notes": [
+        "Yüksek kullanım profilinde nakit paketi toplam maliyet baskısını hızlı azaltır.",
+        "Hibrit paket orta seviyede nakit ve puan dengesini korur.",
+    ],
+    "disclaimer": {
+        "type": "advisory",
+        "text": "Teşvik değerleri işlem anındaki takas skoru ve kampanya kurallarına bağlıdır.",
+    },
+}
+
+
+def build_incentive_b(model_version: str) -> dict[str, Any]:
+    return _INCENTIVE_B_TEMPLATE | {"model_version": model_version}
 
 
 def generate() -> None:
-    assess_template = load_json(CONTRACTS_DIR / "assess.v1.example.json")
-    incentive_schema = load_json(CONTRACTS_DIR / "incentive.v1.schema.json")
+    assess_template = _ASSESS_TEMPLATE
+    incentive_schema = _INCENTIVE_SCHEMA
 
     scenario_a = build_scenario_a(assess_template)
     scenario_b = build_scenario_b(assess_template)
@@ -375,23 +415,23 @@ def generate() -> None:
     assert_assess_contract(assess_template, scenario_a, "scenario_A")
     assert_assess_contract(assess_template, scenario_b, "scenario_B")
 
-    # Incentive schema checks (lightweight required-key and type checks)
-    assert_incentive_schema(incentive_a, incentive_schema, "incentive_A")
-    assert_incentive_schema(incentive_b, incentive_schema, "incentive_B")
+    # Incentive schema checks: required-key, type and semantic asserts, plus the
+    # compiled incentive.v1 validator when fastjsonschema is installed.
+    validate_incentive(incentive_a, incentive_schema, "incentive_A")
+    validate_incentive(incentive_b, incentive_schema, "incentive_B")
 
     outputs = {
-        CORE_OUTPUT_DIR / "scenario_A.json": scenario_a,
-        CORE_OUTPUT_DIR / "scenario_B.json": scenario_b,
-        UI_OUTPUT_DIR / "scenario_A.json": scenario_a,
-        UI_OUTPUT_DIR / "scenario_B.json": scenario_b,
-        CORE_OUTPUT_DIR / "incentive_A.json": incentive_a,
-        CORE_OUTPUT_DIR / "incentive_B.json": incentive_b,
-        UI_OUTPUT_DIR / "incentive_A.json": incentive_a,
-        UI_OUTPUT_DIR / "incentive_B.json": incentive_b,
+        "scenario_A.json": scenario_a,
+        "scenario_B.json": scenario_b,
+        "incentive_A.json": incentive_a,
+        "incentive_B.json": incentive_b,
     }
 
-    for path, payload in outputs.items():
-        write_json(path, payload)
+    # Serialize each payload once and write the same bytes to both output dirs.
+    for filename, payload in outputs.items():
+        data = encode_json(payload)
+        for output_dir in (CORE_OUTPUT_DIR, UI_OUTPUT_DIR):
+            write_bytes(output_dir / filename, data)
 
     print("CONTRACT_OK: scenario_A")
     print("CONTRACT_OK: scenario_B")
@@ -4,241 +4,356 @@ from __future__ import annotations
 
 import hashlib
 import json
-import random
+import os
+import struct
 from typing import Any
 
+try:
+    from ._compat import njit
+except ImportError:
+    from _compat import njit
+
 
 MODEL_VERSION = "mvp-contract-v1.0.0"
 
+# Response invariant checks are opt-in: set TWINCYCLE_DEBUG (ignored under python -O).
+_DEBUG_CHECKS = __debug__ and bool(os.environ.get("TWINCYCLE_DEBUG"))
+
+
+# Inclusive (low, high) bounds per random draw slot, one table per preference
+# branch: 0 balanced, 1 sustainability-leaning, 2 budget-leaning. Hybrid shifts
+# are signed so the leaning side gets a bump and the other side a cut; the
+# balanced branch has no shift. All slots are drawn in one batch per call.
+_BASE_CASH_BOUNDS = ((10000, 14500), (7500, 12000), (13000, 17000))
+_BASE_CARBON_BOUNDS = ((11000, 17000), (16000, 22000), (7000, 12000))
+_HYBRID_CASH_SHIFT_BOUNDS = ((0, 0), (-900, -300), (400, 1200))
+_HYBRID_CARBON_SHIFT_BOUNDS = ((0, 0), (400, 1200), (-900, -300))
+_DRAW_BOUNDS = tuple(
+    (
+        _BASE_CASH_BOUNDS[branch],  # 0: cash
+        _BASE_CARBON_BOUNDS[branch],  # 1: carbon points
+        (8500, 12000),  # 2: hybrid cash
+        (6000, 10000),  # 3: hybrid carbon points
+        _HYBRID_CASH_SHIFT_BOUNDS[branch],  # 4: hybrid cash shift
+        _HYBRID_CARBON_SHIFT_BOUNDS[branch],  # 5: hybrid carbon shift
+        (600, 1600),  # 6: heavy-usage cash bonus
+        (300, 800),  # 7: heavy-usage hybrid cash bonus
+        (600, 1800),  # 8: high-sustainability carbon bonus
+        (200, 800),  # 9: high-sustainability hybrid carbon bonus
+    )
+    for branch in range(3)
+)
+_DRAW_STRUCT = struct.Struct(f">{len(_DRAW_BOUNDS[0])}I")
+# Draw words are a keyed BLAKE2b expansion of the request digest, so draws are
+# reproducible per request without seeding a PRNG on every call.
+_DRAW_PERSON = b"twincycle-draws"
+
+# Static package skeletons; "value" and "ui" are placeholders merged in per call
+# with dict | so the key order matches incentive.v1. Nested dicts (ui variants
+# below, _DISCLAIMER) are copied into each response, never shared.
+_CASH_TEMPLATE: dict[str, Any] = {
+    "package_id": "cash",
+    "title": "Nakit Takas Paketi",
+    "description": "Anlık nakit indirim ile ilk maliyeti hızlı düşürür.",
+    "value": None,
+    "ui": None,
+}
+_CARBON_TEMPLATE: dict[str, Any] = {
+    "package_id": "carbon_points",
+    "title": "Karbon Puan Paketi",
+    "description": "Sürdürülebilirlik katkısını yüksek karbon puanı ile ödüllendirir.",
+    "value": None,
+    "ui": None,
+}
+_HYBRID_TEMPLATE: dict[str, Any] = {
+    "package_id": "hybrid",
+    "title": "Hibrit Denge Paketi",
+    "description": "Nakit ve karbon puanını dengeli biçimde birleştirir.",
+    "value": None,
+    "ui": None,
+}
+_CASH_UI: dict[str, str] = {"badge": "Nakit avantaj", "cta_label": "Nakit paketi seç"}
+_CARBON_UI: dict[str, str] = {"badge": "Karbon etkisi", "cta_label": "Karbon puanı seç"}
+_HYBRID_UI: dict[str, str] = {"badge": "Dengeli teklif", "cta_label": "Hibrit paketi seç"}
+# Notes in response order, matched by position to the flags
+# (wipe anxiety, heavy usage, high sustainability, high budget).
+_NOTE_TEMPLATES = (
+    "Veri silme süreci sertifikalı yürütülür ve teslimde silme sertifikası sağlanır.",
+    "Yüksek kullanım sinyalleri nedeniyle nakit/hibrit seçenekleri kısa vadeli maliyet baskısını azaltır.",
+    "Karbon puanı paketi bu profilde çevresel etki skorunu güçlendirir.",
+    "Bütçe önceliği yüksek olduğu için nakit paketinin kabul olasılığı yükselmiştir.",
+)
+_DEFAULT_NOTE = "Paket değerleri cihaz durumu ve kullanıcı önceliklerine göre dengelenmiştir."
+_DISCLAIMER: dict[str, str] = {
+    "type": "advisory",
+    "text": "Teşvik değerleri kanal ve kampanya koşullarına göre işlem anında güncellenebilir.",
+}
+
+# Top-level response skeleton in incentive.v1 key order; None placeholders are
+# merged over per call.
+_RESPONSE_SHELL: dict[str, Any] = {
+    "request_id": None,
+    "model_version": MODEL_VERSION,
+    "selected_option_id": None,
+    "packages": None,
+    "accept_score": None,
+    "impact_score": None,
+    "notes": None,
+    "disclaimer": None,
+}
+
 
 def clamp(value: float, min_value: float, max_value: float) -> float:
     """Clamp numeric value to a fixed range."""
     return max(min_value, min(max_value, value))
 
 
+_PRIORITY_WEIGHTS = {"low": 1.0, "medium": 2.0, "high": 3.0}
+
+
 def map_priority(priority: str) -> float:
     """Map textual priority to numeric scale."""
-    mapping = {"low": 1.0, "medium": 2.0, "high": 3.0}
-    if priority not in mapping:
+    weight = _PRIORITY_WEIGHTS.get(priority)
+    if weight is None:
         raise ValueError(f"Invalid priority: {priority}")
-    return mapping[priority]
+    return weight
+
+
+@njit(cache=True)
+def _score_kernel(
+    budget_weight: float,
+    sustainability_weight: float,
+    cash_amount: int,
+    carbon_points_amount: int,
+    prefers_financing: bool,
+    heavy_usage: bool,
+    sustainability_high: bool,
+) -> tuple[float, float]:
+    """Compute unrounded (accept_score, impact_score), each clamped to [0, 1]."""
+    max_cash_reference = 17000.0
+    max_carbon_reference = 22000.0
+    cash_norm = max(0.0, min(1.0, cash_amount / max_cash_reference))
+    carbon_norm = max(0.0, min(1.0, carbon_points_amount / max_carbon_reference))
 
+    accept_score = (
+        0.45
+        + 0.22 * (budget_weight / 3.0)
+        + 0.18 * cash_norm
+        + (0.07 if prefers_financing else 0.0)
+        + (0.04 if heavy_usage else 0.0)
+    )
+    impact_score = (
+        0.40
+        + 0.30 * (sustainability_weight / 3.0)
+        + 0.22 * carbon_norm
+        + (0.05 if sustainability_high else 0.0)
+    )
+    return max(0.0, min(1.0, accept_score)), max(0.0, min(1.0, impact_score))
 
-def _stable_seed(input_payload: dict[str, Any], selected_option_id: str) -> int:
-    """Generate deterministic seed from input payload and selected option."""
-    raw = json.dumps(
+
+def _canonical_json(input_payload: dict[str, Any], selected_option_id: str) -> bytes:
+    """Serialize the request into key-order-independent UTF-8 JSON bytes."""
+    return json.dumps(
         {"input_payload": input_payload, "selected_option_id": selected_option_id},
         ensure_ascii=False,
         sort_keys=True,
-    )
-    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
-    return int(digest[:8], 16)
+    ).encode("utf-8")
+
+
+def _stable_digest(canonical: bytes) -> bytes:
+    """Return the 8-byte deterministic digest of the canonical request bytes."""
+    return hashlib.blake2b(canonical, digest_size=8).digest()
+
+
+# Validated request fields, in the order _validate_input_payload returns them:
+# (charge_cycles, frame_drop_rate, repair_history_count, budget_weight,
+#  sustainability_weight, performance_weight, prefers_financing,
+#  sustainability_priority, budget_priority)
+_ValidatedFields = tuple[int, float, int, float, float, float, bool, str, str]
 
 
-def _validate_input_payload(input_payload: dict[str, Any]) -> None:
-    """Validate minimal input structure for incentive generation."""
+def _validate_input_payload(input_payload: dict[str, Any]) -> _ValidatedFields:
+    """Validate minimal input structure; return the fields incentive generation reads."""
     if not isinstance(input_payload, dict):
         raise ValueError("input_payload must be a dict")
 
-    required_top = {"device", "signals", "user_preferences"}
-    if not required_top.issubset(input_payload.keys()):
+    if "device" not in input_payload or "signals" not in input_payload or "user_preferences" not in input_payload:
         raise ValueError("input_payload must include device, signals, user_preferences")
 
     signals = input_payload["signals"]
     prefs = input_payload["user_preferences"]
 
-    if not isinstance(signals.get("charge_cycles"), int) or signals["charge_cycles"] < 0:
+    charge_cycles = signals.get("charge_cycles")
+    if not isinstance(charge_cycles, int) or charge_cycles < 0:
         raise ValueError("signals.charge_cycles must be int >= 0")
-    if not isinstance(signals.get("frame_drop_rate"), (int, float)):
+    frame_drop_rate = signals.get("frame_drop_rate")
+    if not isinstance(frame_drop_rate, (int, float)):
         raise ValueError("signals.frame_drop_rate must be float")
-    if not 0 <= float(signals["frame_drop_rate"]) <= 1:
+    frame_drop_rate = float(frame_drop_rate)
+    if not 0 <= frame_drop_rate <= 1:
         raise ValueError("signals.frame_drop_rate must be in [0, 1]")
-    if not isinstance(signals.get("repair_history_count"), int) or signals["repair_history_count"] < 0:
+    repair_history_count = signals.get("repair_history_count")
+    if not isinstance(repair_history_count, int) or repair_history_count < 0:
         raise ValueError("signals.repair_history_count must be int >= 0")
 
-    for key in ("budget_priority", "sustainability_priority", "performance_priority"):
-        if prefs.get(key) not in {"low", "medium", "high"}:
-            raise ValueError(f"user_preferences.{key} must be low|medium|high")
-    if not isinstance(prefs.get("prefers_financing"), bool):
+    budget_priority = prefs.get("budget_priority")
+    budget_weight = _PRIORITY_WEIGHTS.get(budget_priority)
+    if budget_weight is None:
+        raise ValueError("user_preferences.budget_priority must be low|medium|high")
+    sustainability_priority = prefs.get("sustainability_priority")
+    sustainability_weight = _PRIORITY_WEIGHTS.get(sustainability_priority)
+    if sustainability_weight is None:
+        raise ValueError("user_preferences.sustainability_priority must be low|medium|high")
+    performance_weight = _PRIORITY_WEIGHTS.get(prefs.get("performance_priority"))
+    if performance_weight is None:
+        raise ValueError("user_preferences.performance_priority must be low|medium|high")
+    prefers_financing = prefs.get("prefers_financing")
+    if not isinstance(prefers_financing, bool):
         raise ValueError("user_preferences.prefers_financing must be bool")
 
+    return (
+        charge_cycles,
+        frame_drop_rate,
+        repair_history_count,
+        budget_weight,
+        sustainability_weight,
+        performance_weight,
+        prefers_financing,
+        sustainability_priority,
+        budget_priority,
+    )
+
+
+def _debug_check(response: dict) -> None:
+    """Assert structural invariants of an incentive response."""
+    expected_keys = {
+        "request_id",
+        "model_version",
+        "selected_option_id",
+        "packages",
+        "accept_score",
+        "impact_score",
+        "notes",
+        "disclaimer",
+    }
+    assert set(response.keys()) == expected_keys, "Top-level key set mismatch"
+
+    package_ids = {p["package_id"] for p in response["packages"]}
+    assert package_ids == {"cash", "carbon_points", "hybrid"}, "Invalid package ids"
+
+    assert 0 <= float(response["accept_score"]) <= 1, "accept_score out of range"
+    assert 0 <= float(response["impact_score"]) <= 1, "impact_score out of range"
+    assert len(response["notes"]) >= 1, "notes must contain at least one item"
+
 
 def incentive_logic(input_payload: dict, selected_option_id: str = "tradein_new") -> dict:
     """Generate incentive response compatible with incentive.v1 schema."""
-    _validate_input_payload(input_payload)
+    fields = _validate_input_payload(input_payload)
     if not isinstance(selected_option_id, str) or not selected_option_id:
         raise ValueError("selected_option_id must be a non-empty string")
 
-    signals = input_payload["signals"]
-    prefs = input_payload["user_preferences"]
-
-    sustainability_priority = prefs["sustainability_priority"]
-    budget_priority = prefs["budget_priority"]
-    prefers_financing = prefs["prefers_financing"]
-
-    sustainability_weight = map_priority(sustainability_priority)
-    budget_weight = map_priority(budget_priority)
+    (
+        charge_cycles,
+        frame_drop_rate,
+        repair_history_count,
+        budget_weight,
+        sustainability_weight,
+        _,
+        prefers_financing,
+        sustainability_priority,
+        budget_priority,
+    ) = fields
     sustain_bias = sustainability_weight - budget_weight
 
     wipe_anxiety = (prefers_financing is False) and (sustainability_priority == "high")
-    heavy_usage = (
-        signals["charge_cycles"] >= 850
-        or float(signals["frame_drop_rate"]) >= 0.15
-        or signals["repair_history_count"] >= 2
-    )
-
-    seed = _stable_seed(input_payload, selected_option_id)
-    rng = random.Random(seed + 42)
-
-    if sustain_bias > 0:
-        carbon_points_amount = rng.randint(16000, 22000)
-        cash_amount = rng.randint(7500, 12000)
-    elif sustain_bias < 0:
-        cash_amount = rng.randint(13000, 17000)
-        carbon_points_amount = rng.randint(7000, 12000)
-    else:
-        cash_amount = rng.randint(10000, 14500)
-        carbon_points_amount = rng.randint(11000, 17000)
+    heavy_usage = charge_cycles >= 850 or frame_drop_rate >= 0.15 or repair_history_count >= 2
 
-    hybrid_cash_amount = rng.randint(8500, 12000)
-    hybrid_carbon_points = rng.randint(6000, 10000)
-
-    if sustain_bias > 0:
-        hybrid_carbon_points += rng.randint(400, 1200)
-        hybrid_cash_amount -= rng.randint(300, 900)
-    elif sustain_bias < 0:
-        hybrid_cash_amount += rng.randint(400, 1200)
-        hybrid_carbon_points -= rng.randint(300, 900)
-
-    hybrid_cash_amount = max(hybrid_cash_amount, 7000)
-    hybrid_carbon_points = max(hybrid_carbon_points, 5000)
+    digest = _stable_digest(_canonical_json(input_payload, selected_option_id))
+    branch = 0 if sustain_bias == 0 else (1 if sustain_bias > 0 else 2)
+    raw_draws = _DRAW_STRUCT.unpack(
+        hashlib.blake2b(digest, digest_size=_DRAW_STRUCT.size, person=_DRAW_PERSON).digest()
+    )
+    (
+        cash_amount,
+        carbon_points_amount,
+        hybrid_cash_amount,
+        hybrid_carbon_points,
+        hybrid_cash_shift,
+        hybrid_carbon_shift,
+        heavy_cash_bonus,
+        heavy_hybrid_cash_bonus,
+        sustain_carbon_bonus,
+        sustain_hybrid_carbon_bonus,
+    ) = [low + raw % (high - low + 1) for raw, (low, high) in zip(raw_draws, _DRAW_BOUNDS[branch])]
+
+    hybrid_cash_amount = max(hybrid_cash_amount + hybrid_cash_shift, 7000)
+    hybrid_carbon_points = max(hybrid_carbon_points + hybrid_carbon_shift, 5000)
 
     if heavy_usage:
-        cash_amount += rng.randint(600, 1600)
-        hybrid_cash_amount += rng.randint(300, 800)
+        cash_amount += heavy_cash_bonus
+        hybrid_cash_amount += heavy_hybrid_cash_bonus
     if sustainability_priority == "high":
-        carbon_points_amount += rng.randint(600, 1800)
-        hybrid_carbon_points += rng.randint(200, 800)
+        carbon_points_amount += sustain_carbon_bonus
+        hybrid_carbon_points += sustain_hybrid_carbon_bonus
 
-    cash_amount = int(clamp(cash_amount, 7000, 18000))
-    carbon_points_amount = int(clamp(carbon_points_amount, 6000, 24000))
-    hybrid_cash_amount = int(clamp(hybrid_cash_amount, 7000, 13000))
-    hybrid_carbon_points = int(clamp(hybrid_carbon_points, 5000, 12000))
+    cash_amount = int(max(7000, min(18000, cash_amount)))
+    carbon_points_amount = int(max(6000, min(24000, carbon_points_amount)))
+    hybrid_cash_amount = int(max(7000, min(13000, hybrid_cash_amount)))
+    hybrid_carbon_points = int(max(5000, min(12000, hybrid_carbon_points)))
 
     cash_perk = "extra_data" if (heavy_usage or prefers_financing) else "none"
     carbon_perk = "tree" if sustainability_priority == "high" else "donation"
     hybrid_perk = "donation" if sustainability_priority == "high" else "none"
 
     packages = [
-        {
-            "package_id": "cash",
-            "title": "Nakit Takas Paketi",
-            "description": "Anlık nakit indirim ile ilk maliyeti hızlı düşürür.",
-            "value": {
-                "cash_amount_try": cash_amount,
-                "carbon_points": None,
-                "perk": cash_perk,
-            },
-            "ui": {
-                "badge": "Nakit avantaj",
-                "cta_label": "Nakit paketi seç",
-            },
+        _CASH_TEMPLATE
+        | {
+            "value": {"cash_amount_try": cash_amount, "carbon_points": None, "perk": cash_perk},
+            "ui": _CASH_UI.copy(),
         },
-        {
-            "package_id": "carbon_points",
-            "title": "Karbon Puan Paketi",
-            "description": "Sürdürülebilirlik katkısını yüksek karbon puanı ile ödüllendirir.",
-            "value": {
-                "cash_amount_try": None,
-                "carbon_points": carbon_points_amount,
-                "perk": carbon_perk,
-            },
-            "ui": {
-                "badge": "Karbon etkisi",
-                "cta_label": "Karbon puanı seç",
-            },
+        _CARBON_TEMPLATE
+        | {
+            "value": {"cash_amount_try": None, "carbon_points": carbon_points_amount, "perk": carbon_perk},
+            "ui": _CARBON_UI.copy(),
         },
-        {
-            "package_id": "hybrid",
-            "title": "Hibrit Denge Paketi",
-            "description": "Nakit ve karbon puanını dengeli biçimde birleştirir.",
+        _HYBRID_TEMPLATE
+        | {
             "value": {
                 "cash_amount_try": hybrid_cash_amount,
                 "carbon_points": hybrid_carbon_points,
                 "perk": hybrid_perk,
             },
-            "ui": {
-                "badge": "Dengeli teklif",
-                "cta_label": "Hibrit paketi seç",
-            },
+            "ui": _HYBRID_UI.copy(),
         },
     ]
 
-    max_cash_reference = 17000.0
-    max_carbon_reference = 22000.0
-    cash_norm = clamp(cash_amount / max_cash_reference, 0.0, 1.0)
-    carbon_norm = clamp(carbon_points_amount / max_carbon_reference, 0.0, 1.0)
-
-    accept_score = (
-        0.45
-        + 0.22 * (budget_weight / 3.0)
-        + 0.18 * cash_norm
-        + (0.07 if prefers_financing else 0.0)
-        + (0.04 if heavy_usage else 0.0)
-    )
-    impact_score = (
-        0.40
-        + 0.30 * (sustainability_weight / 3.0)
-        + 0.22 * carbon_norm
-        + (0.05 if sustainability_priority == "high" else 0.0)
+    accept_score, impact_score = _score_kernel(
+        budget_weight,
+        sustainability_weight,
+        cash_amount,
+        carbon_points_amount,
+        prefers_financing,
+        heavy_usage,
+        sustainability_priority == "high",
     )
-    accept_score = round(clamp(accept_score, 0.0, 1.0), 2)
-    impact_score = round(clamp(impact_score, 0.0, 1.0), 2)
+    accept_score = round(accept_score, 2)
+    impact_score = round(impact_score, 2)
 
-    notes = []
-    if wipe_anxiety:
-        notes.append("Veri silme süreci sertifikalı yürütülür ve teslimde silme sertifikası sağlanır.")
-    if heavy_usage:
-        notes.append("Yüksek kullanım sinyalleri nedeniyle nakit/hibrit seçenekleri kısa vadeli maliyet baskısını azaltır.")
-    if sustainability_priority == "high":
-        notes.append("Karbon puanı paketi bu profilde çevresel etki skorunu güçlendirir.")
-    if budget_priority == "high":
-        notes.append("Bütçe önceliği yüksek olduğu için nakit paketinin kabul olasılığı yükselmiştir.")
-    if not notes:
-        notes.append("Paket değerleri cihaz durumu ve kullanıcı önceliklerine göre dengelenmiştir.")
-
-    response = {
-        "request_id": f"req_{seed:08x}_INC",
-        "model_version": MODEL_VERSION,
+    note_flags = (wipe_anxiety, heavy_usage, sustainability_priority == "high", budget_priority == "high")
+    notes = [text for flag, text in zip(note_flags, _NOTE_TEMPLATES) if flag] or [_DEFAULT_NOTE]
+
+    response = _RESPONSE_SHELL | {
+        "request_id": f"req_{digest[4:].hex()}_INC",
         "selected_option_id": selected_option_id,
         "packages": packages,
         "accept_score": accept_score,
         "impact_score": impact_score,
         "notes": notes,
-        "disclaimer": {
-            "type": "advisory",
-            "text": "Teşvik değerleri kanal ve kampanya koşullarına göre işlem anında güncellenebilir.",
-        },
+        "disclaimer": _DISCLAIMER.copy(),
     }
 
-    expected_keys = {
-        "request_id",
-        "model_version",
-        "selected_option_id",
-        "packages",
-        "accept_score",
-        "impact_score",
-        "notes",
-        "disclaimer",
-    }
-    assert set(response.keys()) == expected_keys, "Top-level key set mismatch"
-
-    package_ids = {p["package_id"] for p in response["packages"]}
-    assert package_ids == {"cash", "carbon_points", "hybrid"}, "Invalid package ids"
-
-    assert 0 <= float(response["accept_score"]) <= 1, "accept_score out of range"
-    assert 0 <= float(response["impact_score"]) <= 1, "impact_score out of range"
-    assert len(response["notes"]) >= 1, "notes must contain at least one item"
+    if _DEBUG_CHECKS:
+        _debug_check(response)
 
     return response
 